@@ -4,10 +4,16 @@ import os
 from dotenv import load_dotenv
 from youtube_transcript_api import YouTubeTranscriptApi
 import google.generativeai as genai
-from googletrans import Translator
+from google.api_core import exceptions as google_exceptions
 import re
+import hashlib
+import datetime
+import tempfile
 from io import BytesIO
 from fpdf import FPDF
+from sklearn.feature_extraction.text import TfidfVectorizer
+import yt_dlp
+from faster_whisper import WhisperModel, BatchedInferencePipeline
 
 # Load environment variables
 load_dotenv()
@@ -15,21 +21,61 @@ load_dotenv()
 # Configure Google Generative AI
 genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 
-# Initialize the translator
-translator = Translator()
+# Gemini model used for summaries (context caching needs a stable model version)
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "models/gemini-2.5-flash")
+
+# Smallest transcript, in tokens, the model accepts as cached context
+CONTEXT_CACHE_MIN_TOKENS = int(os.getenv("GEMINI_CACHE_MIN_TOKENS", "1024"))
+
+# How long a transcript stays cached as Gemini context
+CONTEXT_CACHE_TTL = datetime.timedelta(minutes=10)
+
+# Function to load the Gemini model once and share it across reruns
+@st.cache_resource
+def get_gemini_model():
+    return genai.GenerativeModel(GEMINI_MODEL)
+
+# Directory where generated summaries are kept across sessions
+SUMMARY_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "yt_summarizer")
+
+# Directory for downloaded audio tracks, kept out of the working directory
+AUDIO_CACHE_DIR = os.path.join(SUMMARY_CACHE_DIR, "audio")
+
+# Unicode font used for PDF downloads, bundled alongside the app
+FONT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts", "NotoSerif-Regular.ttf")
+
+# yt-dlp options for fetching a video's audio track as 16 kHz mono WAV,
+# the input Whisper resamples to anyway, so a low bitrate stream is enough
+YDL_OPTS = {
+    "format": "bestaudio[abr<=64]/worstaudio/best",
+    "outtmpl": os.path.join(AUDIO_CACHE_DIR, "%(id)s.%(ext)s"),
+    "concurrent_fragment_downloads": 8,
+    "quiet": True,
+    "postprocessors": [{"key": "FFmpegExtractAudio", "preferredcodec": "wav", "preferredquality": "0"}],
+    "postprocessor_args": {"extractaudio": ["-ar", "16000", "-ac", "1"]},
+}
+
+# Largest transcript, in words, sent to Gemini for summarization
+MAX_TRANSCRIPT_WORDS = 6000
+
+# Languages a summary can be written in
+SUMMARY_LANGUAGES = ["English", "Kannada", "Hindi", "Telugu", "Tamil", "Malayalam"]
 
 # Base prompt for summarization
 base_prompt = """
 You are a YouTube video summarizer. Take the transcript text and summarize 
 the video as per the selected format. Format: {summary_format}.
+Write the summary in {summary_language}, whatever language the transcript is in.
 Please provide the summary of the text given here:
 """
 
+# Pattern for the 11-character video ID in the supported YouTube URL forms
+_VIDEO_ID_RE = re.compile(r"(?:v=|youtu\.be/|embed/|v/|watch\?v=|shorts/|e/|^)([A-Za-z0-9_-]{11})")
+
 # Function to extract video ID from URL
 def extract_video_id(youtube_url):
     try:
-        pattern = r"(?:v=|youtu\.be/|embed/|v/|watch\?v=|shorts/|e/|^)([A-Za-z0-9_-]{11})"
-        match = re.search(pattern, youtube_url)
+        match = _VIDEO_ID_RE.search(youtube_url)
         if match:
             return match.group(1)
         else:
@@ -39,50 +85,185 @@ def extract_video_id(youtube_url):
         st.error(f"Error parsing YouTube URL: {e}")
         return None
 
-# Function to extract transcript details
-def extract_transcript_details(video_id):
+# Function to fetch a transcript, cached per video so widget reruns skip the API
+@st.cache_data(ttl=3600, show_spinner=False)
+def _get_transcript(video_id):
+    # Take whichever language the captions are in (manual ones are listed first)
+    transcript_data = next(iter(YouTubeTranscriptApi().list(video_id))).fetch()
+    return " ".join([snippet.text for snippet in transcript_data])
+
+# Function to look up the audio stream of a video, cached per video
+@st.cache_data(ttl=3600, show_spinner=False)
+def _probe_audio_stream(video_id, _youtube_link):
+    with yt_dlp.YoutubeDL(YDL_OPTS) as ydl:
+        return ydl.sanitize_info(ydl.extract_info(_youtube_link, download=False))
+
+# Function to extract transcript details, probing the audio stream only when there is none
+def extract_transcript_details(video_id, youtube_link):
     try:
-        transcript_data = YouTubeTranscriptApi.get_transcript(video_id)
-        transcript = " ".join([entry["text"] for entry in transcript_data])
-        return transcript
+        return _get_transcript(video_id), None
     except Exception as e:
         st.error(f"Error fetching transcript: {e}")
-        return None
+    try:
+        return None, _probe_audio_stream(video_id, youtube_link)
+    except Exception as e:
+        st.error(f"Error finding audio stream: {e}")
+        return None, None
+
+# Function to load the Whisper model once and share it across reruns
+@st.cache_resource
+def get_whisper_model():
+    return WhisperModel("base", device="cpu", compute_type="int8", cpu_threads=os.cpu_count())
+
+# Function to wrap the Whisper model for batched decoding of speech segments
+@st.cache_resource
+def get_whisper_pipeline():
+    return BatchedInferencePipeline(model=get_whisper_model())
+
+# Function to download the audio track of a video
+def _download_audio(audio_stream):
+    # Reuse the probed info so the formats aren't extracted a second time
+    with yt_dlp.YoutubeDL(YDL_OPTS) as ydl:
+        info = ydl.process_ie_result(audio_stream, download=True)
+    return info["requested_downloads"][0]["filepath"]
 
-# Function to translate text
-def translate_text(text, src_lang, dest_lang="en"):
+# Function to download and transcribe a video's audio, cached per video
+@st.cache_data(show_spinner=False)
+def _transcribe_audio(video_id, _audio_stream):
+    audio_path = _download_audio(_audio_stream)
     try:
-        translation = translator.translate(text, src=src_lang, dest=dest_lang)
-        return translation.text
+        pipeline = get_whisper_pipeline()
+        segments, _ = pipeline.transcribe(audio_path, batch_size=16, vad_filter=True, beam_size=1)
+        return "".join(segment.text for segment in segments)
+    finally:
+        # The WAV is only needed until its text is cached
+        os.remove(audio_path)
+
+# Function to transcribe audio using Whisper
+def process_audio_with_whisper(video_id, audio_stream):
+    try:
+        return _transcribe_audio(video_id, audio_stream)
     except Exception as e:
-        st.error(f"Error translating text: {e}")
+        st.error(f"Error transcribing audio: {e}")
         return None
 
-# Function to generate summary using AI
+# Function to trim a long transcript to its highest TF-IDF scoring sentences
+def trim_transcript(transcript_text, max_words=MAX_TRANSCRIPT_WORDS):
+    if len(transcript_text.split()) <= max_words:
+        return transcript_text
+
+    # Auto-generated captions have little punctuation, so cap sentence length too
+    sentences = []
+    for sentence in re.split(r"(?<=[.!?।])\s+", transcript_text):
+        words = sentence.split()
+        sentences.extend(" ".join(words[i:i + 50]) for i in range(0, len(words), 50))
+
+    # Whitespace tokens keep Indic words whole, where \w stops at vowel signs
+    scores = TfidfVectorizer(token_pattern=r"(?u)\S+").fit_transform(sentences).sum(axis=1).A1
+    kept, word_count = set(), 0
+    for index in sorted(range(len(sentences)), key=lambda i: scores[i], reverse=True):
+        length = len(sentences[index].split())
+        if word_count + length > max_words:
+            continue
+        kept.add(index)
+        word_count += length
+    return " ".join(sentence for i, sentence in enumerate(sentences) if i in kept)
+
+# Function to locate the cached summary for a transcript and prompt
+def _summary_cache_path(transcript_text, prompt):
+    transcript_hash = hashlib.sha256(transcript_text.encode("utf-8")).hexdigest()
+    key = hashlib.sha256(f"{transcript_hash}:{prompt}".encode("utf-8")).hexdigest()
+    return os.path.join(SUMMARY_CACHE_DIR, f"{key}.txt")
+
+# Function to load a Gemini model with the transcript cached as its context,
+# so summaries in another format or size don't re-send the transcript
+def get_transcript_model(transcript_text):
+    transcript_hash = hashlib.sha256(transcript_text.encode("utf-8")).hexdigest()
+    context_caches = st.session_state.setdefault("context_caches", {})
+    cache = context_caches.get(transcript_hash)
+    if cache is False:
+        return None
+    if cache is None or cache.expire_time <= datetime.datetime.now(datetime.timezone.utc):
+        # Transcripts below the model's minimum cacheable size are sent inline
+        if cache is None and get_gemini_model().count_tokens(transcript_text).total_tokens < CONTEXT_CACHE_MIN_TOKENS:
+            context_caches[transcript_hash] = False
+            return None
+        try:
+            cache = genai.caching.CachedContent.create(
+                model=GEMINI_MODEL,
+                contents=[transcript_text],
+                ttl=CONTEXT_CACHE_TTL
+            )
+        except google_exceptions.InvalidArgument as e:
+            # The configured minimum is lower than what this model accepts
+            if "too small" not in str(e):
+                raise
+            context_caches[transcript_hash] = False
+            return None
+        context_caches[transcript_hash] = cache
+    return genai.GenerativeModel.from_cached_content(cached_content=cache)
+
+# Function to generate summary using AI, yielding text as it is generated
 def generate_genmini_content(transcript_text, prompt):
+    cache_path = _summary_cache_path(transcript_text, prompt)
+    if os.path.exists(cache_path):
+        with open(cache_path, encoding="utf-8") as f:
+            yield f.read()
+        return
+
+    model = get_transcript_model(transcript_text)
+    if model:
+        response = model.generate_content(prompt, stream=True)
+    else:
+        response = get_gemini_model().generate_content(prompt + transcript_text, stream=True)
+    parts = []
+    for chunk in response:
+        parts.append(chunk.text)
+        yield chunk.text
+
+    # Only complete summaries are cached, swapped in whole so readers never see a partial file
+    os.makedirs(SUMMARY_CACHE_DIR, exist_ok=True)
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=SUMMARY_CACHE_DIR, suffix=".tmp", delete=False) as f:
+        f.write("".join(parts))
+    os.replace(f.name, cache_path)
+
+# Function to show the summary as it is generated
+def write_summary(transcript_text, prompt):
     try:
-        model = genai.GenerativeModel("gemini-pro")
-        response = model.generate_content(prompt + transcript_text)
-        return response.text
+        transcript_text = trim_transcript(transcript_text)
+        return st.write_stream(generate_genmini_content(transcript_text, prompt))
     except Exception as e:
+        # A stream that fails partway leaves a truncated summary, so discard it
         st.error(f"Error generating summary: {e}")
         return None
 
+# Function to generate TXT
+@st.cache_data(show_spinner=False)
+def generate_txt(summary_text):
+    txt_data = BytesIO()
+    txt_data.write(summary_text.encode("utf-8"))
+    txt_data.seek(0)
+    return txt_data
+
 # Function to generate PDF
+@st.cache_data(show_spinner=False)
 def generate_pdf(summary_text):
     pdf = FPDF()
     pdf.set_auto_page_break(auto=True, margin=15)
     pdf.add_page()
 
     # Add a Unicode font (use a font file that supports Unicode characters)
-    font_path = "C:/Users/subha/Pictures/font/ttf/NotoSerif-Regular.ttf"  # Replace with the path to your font file
-    pdf.add_font("DejaVu", "", font_path, uni=True)
+    pdf.add_font("DejaVu", "", FONT_PATH)
     pdf.set_font("DejaVu", size=12)
 
     # Add the text
     pdf.multi_cell(0, 10, summary_text)
 
-    return pdf.output(dest="S").encode("latin1")
+    # Write the document straight into the buffer handed to Streamlit
+    pdf_data = BytesIO()
+    pdf.output(pdf_data)
+    pdf_data.seek(0)
+    return pdf_data
 
 # Streamlit app
 st.markdown(
@@ -102,13 +283,9 @@ youtube_link = st.text_input("Enter YouTube Video Link")
 
 # User input for language options
 st.subheader("Language Options")
-video_language = st.selectbox(
-    "Select the video's language:",
-    options=["English", "Kannada", "Hindi", "Telugu", "Tamil", "Malayalam", "Other"]
-)
 summary_language = st.selectbox(
     "Select the summary's language:",
-    options=["English", "Kannada", "Hindi", "Telugu", "Tamil", "Malayalam", "Other"]
+    options=SUMMARY_LANGUAGES
 )
 
 # User input for summary size
@@ -127,8 +304,8 @@ summary_format = st.radio(
     index=2
 )
 
-# Adjust the prompt based on input size and format
-summary_prompt = base_prompt.format(summary_format=summary_format) + f" in {summary_size} words:"
+# Adjust the prompt based on input size, format and language
+summary_prompt = base_prompt.format(summary_format=summary_format, summary_language=summary_language) + f" in {summary_size} words:"
 
 # Display video thumbnail if valid
 if youtube_link:
@@ -142,35 +319,21 @@ if youtube_link:
 # Button to generate summary
 if st.button("Generate Summary"):
     if video_id:
-        transcript_text = extract_transcript_details(video_id)
+        transcript_text, audio_stream = extract_transcript_details(video_id, youtube_link)
+        if not transcript_text and audio_stream:
+            # Fall back to transcribing the audio when no captions are available
+            st.info("Transcribing the video's audio instead...")
+            transcript_text = process_audio_with_whisper(video_id, audio_stream)
         if transcript_text:
-            # Translate transcript if video language is not English
-            if video_language != "English":
-                transcript_text = translate_text(transcript_text, src_lang=video_language.lower(), dest_lang="en")
-                if not transcript_text:
-                    st.error("Failed to translate transcript.")
-                    st.stop()
-
-            # Generate summary in English
-            summary = generate_genmini_content(transcript_text, summary_prompt)
+            # Generate summary in the desired language, showing it as it is generated
+            st.subheader(f"Video Summary ({summary_format}) - {summary_language}")
+            summary = write_summary(transcript_text, summary_prompt)
             if summary:
-                # Translate summary to the desired language
-                if summary_language != "English":
-                    summary = translate_text(summary, src_lang="en", dest_lang=summary_language.lower())
-                    if not summary:
-                        st.error("Failed to translate summary.")
-                        st.stop()
-
-                st.subheader(f"Video Summary ({summary_format}) - {summary_language}")
-                st.write(summary)
-
                 # Provide download options
                 col1, col2 = st.columns(2)
                 with col1:
                     # Download as TXT
-                    txt_data = BytesIO()
-                    txt_data.write(summary.encode("utf-8"))
-                    txt_data.seek(0)
+                    txt_data = generate_txt(summary)
                     st.download_button(
                         label="Download as TXT",
                         data=txt_data,
@@ -179,7 +342,7 @@ if st.button("Generate Summary"):
                     )
                 with col2:
                     # Download as PDF
-                    pdf_data = BytesIO(generate_pdf(summary))
+                    pdf_data = generate_pdf(summary)
                     st.download_button(
                         label="Download as PDF",
                         data=pdf_data,
@@ -189,6 +352,6 @@ if st.button("Generate Summary"):
             else:
                 st.error("Failed to generate summary. Please try again.")
         else:
-            st.error("Failed to extract transcript. Ensure the video supports captions.")
+            st.error("Failed to extract transcript. Ensure the video supports captions or has audible speech.")
     else:
         st.error("Invalid YouTube URL. Please enter a valid link.") 